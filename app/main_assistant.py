@@ -5,7 +5,8 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from models.chatbot import StudyChatbot
 from models.study_planner import IntelligentStudyPlanner
 from models.productivity_tracker import ProductivityTracker
-from typing import Dict, List
+from database.db_setup import save_plan
+from typing import Dict, Iterator, List
 
 class StudyAssistant:
     """Main assistant class integrating all study-related components."""
@@ -21,6 +22,9 @@ class StudyAssistant:
     def ask_question(self, question: str) -> str:
         """Ask a question to the chatbot."""
         return self.chatbot.ask(question)
+    def ask_question_stream(self, question: str) -> Iterator[str]:
+        """Ask a question and stream the answer chunk by chunk."""
+        return self.chatbot.ask_stream(question)
     # === STUDY PLANNER ===
     def create_personalized_plan(self, student_profile:Dict,
                                  subject:str,
@@ -39,6 +43,9 @@ class StudyAssistant:
     def get_plan_summary(self, plan: Dict) -> str:
         """Get a summary of the study plan."""
         return self.planner.get_plan_summary(plan)
+    def save_plan(self, plan: Dict) -> int:
+        """Save all sessions of a plan, returns number of sessions saved."""
+        return save_plan(plan)
     
     # === PRODUCTIVITY TRACKER ===
     def log_session(
@@ -89,9 +89,7 @@ elif page == "💬 Ask AI":
 
     if st.button("Ask AI", type="primary"):
         if question:
-            with st.spinner("AI is thinking..."):
-                answer = assistant.ask_question(question)
-                st.success(answer)
+            st.write_stream(assistant.ask_question_stream(question))
 
 # === PAGE 3: STUDY PLANNER ===
 # === PAGE 3: STUDY PLANNER ===
@@ -1,39 +1,120 @@
-from sqlalchemy import  create_engine, Column, Integer, String, Float, DateTime, Boolean, Text
+from sqlalchemy import  create_engine, event, insert, select, Column, Index, Integer, String, Float, DateTime, Boolean, Text
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from datetime import datetime
+import asyncio
+import threading
 
 Base = declarative_base()
 
 class StudySession(Base):
     """Track individual study sessions"""
     __tablename__ = 'study_sessions'
+    __table_args__ = (Index("ix_topic_date", "topic", "date"),)
 
     id = Column(Integer, primary_key=True)
     subject = Column(String(200), nullable=False)  
-    topic = Column(String(200), nullable=False)
+    topic = Column(String(200), nullable=False, index=True)
     duration_minutes = Column(Float, nullable=False)
     completed = Column(Boolean, default=False)
-    date = Column(DateTime, default=datetime.now)
+    date = Column(DateTime, default=datetime.now, index=True)
     notes = Column(Text)
     difficulty_rating = Column(Integer)  # 1-5 scale
     focus_level = Column(Integer)  # 1-10
 
 #database initialization
+# One engine (and connection pool) per process, shared by every session
+engine = create_engine('sqlite:///study_assistant.db', pool_pre_ping=True)
+SessionLocal = sessionmaker(bind=engine, expire_on_commit=False)
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside a writer; NORMAL sync fsyncs less often"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.close()
+
+event.listen(engine, "connect", _set_sqlite_pragmas)
+_schema_ready = False
+_schema_lock = threading.Lock()
+_async_schema_lock = asyncio.Lock()
+
+def _create_schema(connection):
+    Base.metadata.create_all(connection)
+    # create_all skips indexes on tables that already exist
+    for index in StudySession.__table__.indexes:
+        index.create(connection, checkfirst=True)
+
 def init_database():
-    engine = create_engine('sqlite:///study_assistant.db')
-    Base.metadata.create_all(engine)
-    SessionLocal = sessionmaker(bind=engine)
+    global _schema_ready
+    # Fast path: schema already checked in this process, skip the DDL round trips
+    if _schema_ready:
+        return SessionLocal
+    with _schema_lock:
+        if not _schema_ready:
+            with engine.begin() as conn:
+                _create_schema(conn)
+            _schema_ready = True
     return SessionLocal
 
 def get_db():
-    SessionLocal = init_database()
-    db = SessionLocal()
-    try:
-        return db
-    except:
-        db.close()
-        raise
+    init_database()
+    return SessionLocal()
+
+def iter_sessions(db, batch_size=1000):
+    """Stream StudySession rows in batches instead of loading them all.
+
+    Iterate over the result directly; calling list() on it defeats the purpose.
+    """
+    stmt = select(StudySession).execution_options(yield_per=batch_size, stream_results=True)
+    return db.execute(stmt).scalars()
+
+def save_plan(plan):
+    """Store every session of a generated study plan in one bulk insert"""
+    if not plan.get("feasible"):
+        return 0
+    init_database()
+    rows = [
+        {
+            "subject": plan["subject"],
+            "topic": session["topic"],
+            "duration_minutes": session["duration_minutes"],
+            "completed": False,
+            "date": datetime.strptime(day["date"], "%Y-%m-%d"),
+        }
+        for day in plan["daily_plan"]
+        for session in day["sessions"]
+    ]
+    if rows:
+        with engine.begin() as conn:
+            conn.execute(insert(StudySession), rows)
+    return len(rows)
+
+# Async engine for async handlers, so DB I/O doesn't block the event loop
+async_engine = create_async_engine('sqlite+aiosqlite:///study_assistant.db')
+event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+AsyncSessionLocal = async_sessionmaker(async_engine, expire_on_commit=False)
+
+async def init_async_database():
+    """init_database for async code: runs the DDL on the async engine"""
+    global _schema_ready
+    if _schema_ready:
+        return AsyncSessionLocal
+    async with _async_schema_lock:
+        if not _schema_ready:
+            async with async_engine.begin() as conn:
+                await conn.run_sync(_create_schema)
+            _schema_ready = True
+    return AsyncSessionLocal
+
+async def get_async_db():
+    """Yield an AsyncSession, e.g. as a FastAPI dependency"""
+    await init_async_database()
+    async with AsyncSessionLocal() as db:
+        yield db
 
 if __name__ == "__main__":
     print("Initializing database...")
@@ -1,54 +1,236 @@
 from langchain_huggingface import ChatHuggingFace, HuggingFaceEndpoint
 from langchain_core.prompts import ChatPromptTemplate
+from huggingface_hub import AsyncInferenceClient
+from collections import OrderedDict
+import asyncio
+import hashlib
 import os
+import threading
+import weakref
 from dotenv import load_dotenv
 import traceback
 
 load_dotenv()
 
-class StudyChatbot:
-    def __init__(self):
-        print("Initializing chatbot...")
-        
-        # Create base endpoint
-        llm = HuggingFaceEndpoint(
-            repo_id="HuggingFaceH4/zephyr-7b-beta",  # Works well with chat
-            temperature=0.7,
-            max_new_tokens=512,
-        )
-        
-        # Wrap with ChatHuggingFace
-        self.llm = ChatHuggingFace(llm=llm)
-        
-        # Use ChatPromptTemplate for chat models
-        self.prompt = ChatPromptTemplate.from_template(
-            """You are a helpful study assistant. Answer the student's question clearly and concisely.
+MODEL_ID = "HuggingFaceH4/zephyr-7b-beta"
+MAX_CONCURRENT_REQUESTS = 32
+
+# Most answers are short; callers can raise the limit per question
+DEFAULT_MAX_NEW_TOKENS = 200
+TEMPERATURE = 0.7
+STOP_SEQUENCES = ["\n\nQuestion:", "</s>"]
+
+PROMPT_TEMPLATE = """You are a helpful study assistant. Answer the student's question clearly and concisely.
 
 Context: {context}
 Question: {question}
 
 Answer:"""
-        )
+
+# Endpoint, prompt and chain are built once and shared by every StudyChatbot
+_LLM = None
+_PROMPT = None
+_CHAIN = None
+_chain_lock = threading.Lock()
+
+def _get_chain():
+    """Return the shared (llm, prompt, chain), creating them on first use"""
+    global _LLM, _PROMPT, _CHAIN
+    with _chain_lock:
+        if _CHAIN is None:
+            # Create base endpoint
+            endpoint = HuggingFaceEndpoint(
+                repo_id=MODEL_ID,  # Works well with chat
+                temperature=TEMPERATURE,
+                max_new_tokens=DEFAULT_MAX_NEW_TOKENS,
+                stop_sequences=STOP_SEQUENCES,
+            )
+            
+            # Wrap with ChatHuggingFace
+            _LLM = ChatHuggingFace(llm=endpoint)
+            
+            # Use ChatPromptTemplate for chat models
+            _PROMPT = ChatPromptTemplate.from_template(PROMPT_TEMPLATE)
+            
+            _CHAIN = _PROMPT | _LLM
+    return _LLM, _PROMPT, _CHAIN
+
+# Answers to repeated questions are served from memory (least recently used evicted)
+RESPONSE_CACHE_SIZE = 1024
+_response_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _cache_key(question, context, max_new_tokens=None):
+    raw = f"{question}\0{context}\0{max_new_tokens}"
+    return hashlib.blake2b(raw.encode(), digest_size=16).hexdigest()
+
+def _cache_get(key):
+    with _cache_lock:
+        answer = _response_cache.get(key)
+        if answer is not None:
+            _response_cache.move_to_end(key)
+        return answer
+
+def _cache_put(key, answer):
+    with _cache_lock:
+        _response_cache[key] = answer
+        _response_cache.move_to_end(key)
+        if len(_response_cache) > RESPONSE_CACHE_SIZE:
+            _response_cache.popitem(last=False)
+
+# One aask concurrency cap per event loop. A single module-level Semaphore
+# would bind to the first loop that waits on it and then fail with
+# "bound to a different event loop" under a later asyncio.run() or test loop.
+_semaphores = weakref.WeakKeyDictionary()
+
+def _get_semaphore():
+    """Semaphore limiting aask calls on the running event loop"""
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
+    return semaphore
+
+def _batch_answer(response):
+    """Answer text for one batch result, or the same Error string ask returns"""
+    if isinstance(response, Exception):
+        traceback.print_exception(response)
+        return f"Error: {str(response)}"
+    return response.content.strip()
+
+class StudyChatbot:
+    # One client object for all instances. This does not pool connections:
+    # huggingface_hub 0.36 opens a new aiohttp session for every call.
+    async_client = AsyncInferenceClient(model=MODEL_ID)
+
+    def __init__(self):
+        print("Initializing chatbot...")
         
-        self.chain = self.prompt | self.llm
+        self.llm, self.prompt, self.chain = _get_chain()
         print("✅ Chatbot ready!")
     
-    def ask(self, question, context=""):
+    def _chain_for(self, max_new_tokens):
+        """Shared chain, or one with a different token limit if requested"""
+        if max_new_tokens is None:
+            return self.chain
+        return self.prompt | self.llm.bind(max_tokens=max_new_tokens)
+
+    def ask(self, question, context="", max_new_tokens=None):
         """Ask a question to the chatbot"""
+        key = _cache_key(question, context, max_new_tokens)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
         try:
             print(f"Processing: {question}")
-            response = self.chain.invoke({
+            response = self._chain_for(max_new_tokens).invoke({
                 "question": question,
                 "context": context
             })
             # Extract content from AIMessage
-            return response.content.strip()
+            answer = response.content.strip()
+            _cache_put(key, answer)
+            return answer
         except Exception as e:
             print(f"\n❌ FULL ERROR DETAILS:")
             print(f"Error: {str(e)}")
             traceback.print_exc()
             return f"Error: {str(e)}"
 
+    def ask_stream(self, question, context="", max_new_tokens=None):
+        """Ask a question and yield the answer as it is generated"""
+        key = _cache_key(question, context, max_new_tokens)
+        cached = _cache_get(key)
+        if cached is not None:
+            yield cached
+            return
+        try:
+            chunks = []
+            for chunk in self._chain_for(max_new_tokens).stream({
+                "question": question,
+                "context": context
+            }):
+                if chunk.content:
+                    chunks.append(chunk.content)
+                    yield chunk.content
+            _cache_put(key, "".join(chunks).strip())
+        except Exception as e:
+            traceback.print_exc()
+            yield f"Error: {str(e)}"
+
+    async def aask(self, question, context="", max_new_tokens=None):
+        """Async version of ask, for serving many users from one event loop"""
+        key = _cache_key(question, context, max_new_tokens)
+        cached = _cache_get(key)
+        if cached is not None:
+            return cached
+        try:
+            async with _get_semaphore():
+                response = await self.async_client.chat_completion(
+                    messages=[{
+                        "role": "user",
+                        "content": PROMPT_TEMPLATE.format(question=question, context=context)
+                    }],
+                    max_tokens=max_new_tokens or DEFAULT_MAX_NEW_TOKENS,
+                    stop=STOP_SEQUENCES,
+                    temperature=TEMPERATURE,
+                )
+            answer = response.choices[0].message.content.strip()
+            _cache_put(key, answer)
+            return answer
+        except Exception as e:
+            traceback.print_exc()
+            return f"Error: {str(e)}"
+
+    def _batch_lookup(self, items, max_new_tokens):
+        """Split a batch into cached answers (None where missing) and inputs still to ask"""
+        answers, keys, pending, inputs = [], [], [], []
+        for i, item in enumerate(items):
+            question, context = item["question"], item.get("context", "")
+            key = _cache_key(question, context, max_new_tokens)
+            cached = _cache_get(key)
+            answers.append(cached)
+            keys.append(key)
+            if cached is None:
+                pending.append(i)
+                inputs.append({"question": question, "context": context})
+        return answers, keys, pending, inputs
+
+    def _batch_fill(self, answers, keys, pending, responses):
+        """Put batch results back in input order, caching the successful ones"""
+        for i, response in zip(pending, responses):
+            answers[i] = _batch_answer(response)
+            if not isinstance(response, Exception):
+                _cache_put(keys[i], answers[i])
+        return answers
+
+    def ask_many(self, items, max_concurrency=16, max_new_tokens=None):
+        """Ask several questions in one batched call.
+
+        items: list of {"question": ..., "context": ...} dicts
+        """
+        answers, keys, pending, inputs = self._batch_lookup(items, max_new_tokens)
+        if not inputs:
+            return answers
+        responses = self._chain_for(max_new_tokens).batch(
+            inputs,
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+        return self._batch_fill(answers, keys, pending, responses)
+
+    async def aask_many(self, items, max_concurrency=16, max_new_tokens=None):
+        """Async version of ask_many"""
+        answers, keys, pending, inputs = self._batch_lookup(items, max_new_tokens)
+        if not inputs:
+            return answers
+        responses = await self._chain_for(max_new_tokens).abatch(
+            inputs,
+            config={"max_concurrency": max_concurrency},
+            return_exceptions=True
+        )
+        return self._batch_fill(answers, keys, pending, responses)
+
 if __name__ == "__main__":
     try:
         chatbot = StudyChatbot()
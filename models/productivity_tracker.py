@@ -39,7 +39,10 @@ class ProductivityTracker:
   def get_today_stats(self) -> Dict:
      """Get today's study statistics"""
      today_start = datetime.now().replace(hour=0, minute=0, second=0)
-     sessions = self.db.query(StudySession).filter(StudySession.date >= today_start).all()
+     sessions = self.db.query(StudySession).filter(
+         StudySession.completed.is_(True),
+         StudySession.date >= today_start
+     ).all()
 
      if not sessions:
          return {
@@ -66,6 +69,7 @@ class ProductivityTracker:
         day_end = check_date + timedelta(days=1)
 
         count = self.db.query(StudySession).filter(
+            StudySession.completed.is_(True),
             StudySession.date >= day_start,
             StudySession.date < day_end
         ).count()
@@ -1,6 +1,63 @@
+from collections import deque
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import List, Dict, Optional
-import json
+import numpy as np
+import orjson
+
+
+# Session activity templates, indexed by duration bucket (short, medium, long)
+_ACTIVITY_TEMPLATES = (
+    (
+        "Quick review of {topic} concepts",
+        "Practice 2-3 problems"
+    ),
+    (
+        "Study {topic} theory (30 min)",
+        "Practice 3-5 problems on {topic} (20 min)",
+        "Review and summarize (10 min)"
+    ),
+    (
+        "Watch tutorial/lecture on {topic} (30 min)",
+        "Read textbook chapter on {topic} (25 min)",
+        "Take notes and summarize key concepts (20 min)",
+        "Practice problems/examples (25 min)",
+        "Create flashcards for {topic} (10 min)"
+    ),
+)
+_WEAK_AREA_ACTIVITY = "Extra focus needed - spend more time on examples"
+
+# Revision activity templates
+_FINAL_REVIEW_ACTIVITIES = (
+    "Quick review of all topics (1 hour)",
+    "Take full mock test (1.5 hours)",
+    "Review mistakes and weak areas (30 min)"
+)
+_INTENSIVE_REVISION_TEMPLATES = (
+    "Intensive review of {topic}",
+    "Practice difficult problems on {topic}",
+    "Clarify doubts"
+)
+_REVISION_TEMPLATES = (
+    "Review {topic} notes",
+    "Practice mixed problems"
+)
+
+
+@lru_cache(maxsize=1024)
+def _cached_activities(topic: str, bucket: int, is_weak: bool) -> tuple:
+    """Activity list for a topic, duration bucket (0-2) and weak-area flag"""
+    
+    fields = {"topic": topic}
+    activities = tuple(
+        template.format_map(fields) for template in _ACTIVITY_TEMPLATES[bucket]
+    )
+    
+    if is_weak:
+        activities += (_WEAK_AREA_ACTIVITY,)
+    
+    return activities
+
 
 class IntelligentStudyPlanner:
     """AI-powered study planner that adapts to individual students"""
@@ -106,26 +163,20 @@ class IntelligentStudyPlanner:
         """Calculate time needed for each topic based on student's pace and weak areas"""
         
         base_hours = self.learning_pace[pace]["hours_per_topic"]
-        topic_times = {}
+        multipliers = np.ones(len(topics))
         
-        for topic in topics:
-            hours = base_hours
-            
-            # Add extra time for weak areas
-            if topic in weak_areas:
-                hours *= 1.5
-            
-            # Adjust based on difficulty
-            if difficulty_levels and topic in difficulty_levels:
-                diff = difficulty_levels[topic]
-                if diff == "hard":
-                    hours *= 1.3
-                elif diff == "easy":
-                    hours *= 0.7
-            
-            topic_times[topic] = round(hours, 1)
+        # Add extra time for weak areas
+        weak = set(weak_areas)
+        multipliers[np.fromiter((topic in weak for topic in topics), bool, len(topics))] *= 1.5
+        
+        # Adjust based on difficulty
+        if difficulty_levels:
+            diffs = np.array([difficulty_levels.get(topic, "") for topic in topics])
+            multipliers[diffs == "hard"] *= 1.3
+            multipliers[diffs == "easy"] *= 0.7
         
-        return topic_times
+        hours = np.round(base_hours * multipliers, 1)
+        return dict(zip(topics, hours.tolist()))
     
     def _create_daily_schedule(
         self,
@@ -143,25 +194,33 @@ class IntelligentStudyPlanner:
         daily_plan = []
         current_date = datetime.now()
         
-        # Get session pattern
+        # Get session pattern (in hours, computed once for the whole schedule)
         session_info = self.session_patterns[pattern]
+        session_length_hours = session_info["session_length"] / 60
+        break_length_hours = session_info["break_length"] / 60
         
         # Distribute topics across days
-        topics_queue = list(topics)
+        topics_queue = deque(topics)
         revision_days = max(2, int(deadline_days * 0.2))
         study_days = deadline_days - revision_days
         
+        # Format each day's date once (study_days can be negative for tiny deadlines)
+        dates = {
+            offset: (current_date + timedelta(days=offset)).strftime("%Y-%m-%d")
+            for offset in range(min(study_days, 0), study_days + revision_days)
+        }
+        
         day_num = 0
         topic_progress = {topic: 0 for topic in topics}
+        weak_set = frozenset(weak_areas)
         
         # Study phase
         for day in range(study_days):
             day_num += 1
-            date = (current_date + timedelta(days=day)).strftime("%Y-%m-%d")
             
             day_schedule = {
                 "day": day_num,
-                "date": date,
+                "date": dates[day],
                 "phase": "Learning",
                 "preferred_time": preferred_times[day % len(preferred_times)],
                 "sessions": [],
@@ -173,16 +232,19 @@ class IntelligentStudyPlanner:
             # Schedule study sessions for the day
             while hours_remaining > 0 and topics_queue:
                 current_topic = topics_queue[0]
-                time_needed = topic_times[current_topic] - topic_progress[current_topic]
+                target_hours = topic_times[current_topic]
+                time_needed = target_hours - topic_progress[current_topic]
                 
                 # Determine session length
                 session_hours = min(
-                    session_info["session_length"] / 60,
+                    session_length_hours,
                     hours_remaining,
                     time_needed
                 )
                 
                 if session_hours > 0.1:
+                    is_weak = current_topic in weak_set
+                    
                     # Create session
                     session = {
                         "topic": current_topic,
@@ -190,9 +252,9 @@ class IntelligentStudyPlanner:
                         "activities": self._generate_activities(
                             current_topic,
                             session_hours,
-                            current_topic in weak_areas
+                            is_weak
                         ),
-                        "is_weak_area": current_topic in weak_areas
+                        "is_weak_area": is_weak
                     }
                     
                     day_schedule["sessions"].append(session)
@@ -203,20 +265,19 @@ class IntelligentStudyPlanner:
                     
                     # Add break
                     if hours_remaining > 0:
-                        hours_remaining -= session_info["break_length"] / 60
+                        hours_remaining -= break_length_hours
                     
                     # If topic complete, move to next
-                    if topic_progress[current_topic] >= topic_times[current_topic]:
-                        topics_queue.pop(0)
+                    if topic_progress[current_topic] >= target_hours:
+                        topics_queue.popleft()
                 else:
-                    topics_queue.pop(0)
+                    topics_queue.popleft()
             
             daily_plan.append(day_schedule)
         
         # Revision phase
         for day in range(revision_days):
             day_num += 1
-            date = (current_date + timedelta(days=study_days + day)).strftime("%Y-%m-%d")
             
             if day == revision_days - 1:
                 phase = "Final Review & Mock Test"
@@ -227,7 +288,7 @@ class IntelligentStudyPlanner:
             
             day_schedule = {
                 "day": day_num,
-                "date": date,
+                "date": dates[study_days + day],
                 "phase": phase,
                 "preferred_time": preferred_times[day % len(preferred_times)],
                 "sessions": self._generate_revision_sessions(
@@ -248,32 +309,15 @@ class IntelligentStudyPlanner:
     ) -> List[str]:
         """Generate specific activities for a study session"""
         
-        activities = []
-        
         if duration_hours >= 1.5:
-            activities = [
-                f"Watch tutorial/lecture on {topic} (30 min)",
-                f"Read textbook chapter on {topic} (25 min)",
-                f"Take notes and summarize key concepts (20 min)",
-                f"Practice problems/examples (25 min)",
-                f"Create flashcards for {topic} (10 min)"
-            ]
+            bucket = 2
         elif duration_hours >= 1:
-            activities = [
-                f"Study {topic} theory (30 min)",
-                f"Practice 3-5 problems on {topic} (20 min)",
-                f"Review and summarize (10 min)"
-            ]
+            bucket = 1
         else:
-            activities = [
-                f"Quick review of {topic} concepts",
-                f"Practice 2-3 problems"
-            ]
+            bucket = 0
         
-        if is_weak:
-            activities.append(f"Extra focus needed - spend more time on examples")
-        
-        return activities
+        # Cached per (topic, bucket, is_weak); copy so callers get their own list
+        return list(_cached_activities(topic, bucket, is_weak))
     
     def _generate_revision_sessions(
         self,
@@ -289,11 +333,7 @@ class IntelligentStudyPlanner:
                 {
                     "topic": "All Topics",
                     "duration_minutes": int(daily_hours * 30),
-                    "activities": [
-                        "Quick review of all topics (1 hour)",
-                        "Take full mock test (1.5 hours)",
-                        "Review mistakes and weak areas (30 min)"
-                    ]
+                    "activities": list(_FINAL_REVIEW_ACTIVITIES)
                 }
             ]
         elif phase == "Intensive Revision":
@@ -305,9 +345,8 @@ class IntelligentStudyPlanner:
                     "topic": topic,
                     "duration_minutes": time_per_topic,
                     "activities": [
-                        f"Intensive review of {topic}",
-                        f"Practice difficult problems on {topic}",
-                        "Clarify doubts"
+                        template.format_map({"topic": topic})
+                        for template in _INTENSIVE_REVISION_TEMPLATES
                     ],
                     "is_weak_area": True
                 })
@@ -322,8 +361,8 @@ class IntelligentStudyPlanner:
                     "topic": topic,
                     "duration_minutes": time_per_topic,
                     "activities": [
-                        f"Review {topic} notes",
-                        f"Practice mixed problems"
+                        template.format_map({"topic": topic})
+                        for template in _REVISION_TEMPLATES
                     ]
                 })
             
@@ -404,13 +443,12 @@ class IntelligentStudyPlanner:
         """Convert plan to readable summary"""
         
         if not plan.get("feasible"):
-            summary = f"{plan['message']}\n\n"
-            summary += "Suggestions:\n"
+            parts = [f"{plan['message']}\n\n", "Suggestions:\n"]
             for i, suggestion in enumerate(plan['suggestions'], 1):
-                summary += f"  {i}. {suggestion}\n"
-            return summary
+                parts.append(f"  {i}. {suggestion}\n")
+            return "".join(parts)
         
-        summary = f"""
+        parts = [f"""
 PERSONALIZED STUDY PLAN FOR {plan['subject'].upper()}
 
 OVERVIEW:
@@ -422,27 +460,35 @@ OVERVIEW:
   Study Pattern: {plan['student_profile'].get('study_pattern', 'pomodoro').title()}
 
 DAILY SCHEDULE:
-"""
+"""]
         
         for day in plan['daily_plan']:
-            summary += f"\nDay {day['day']} ({day['date']}) - {day['phase']}\n"
-            summary += f"  Preferred Time: {day['preferred_time'].title()}\n"
-            summary += f"  Total Hours: {day['total_hours']:.1f}h\n"
+            parts.append(f"\nDay {day['day']} ({day['date']}) - {day['phase']}\n")
+            parts.append(f"  Preferred Time: {day['preferred_time'].title()}\n")
+            parts.append(f"  Total Hours: {day['total_hours']:.1f}h\n")
             
             if day['sessions']:
-                summary += "  Sessions:\n"
+                parts.append("  Sessions:\n")
                 for i, session in enumerate(day['sessions'][:3], 1):
                     weak_flag = " (Weak Area)" if session.get('is_weak_area') else ""
-                    summary += f"    {i}. {session['topic']}{weak_flag} ({session['duration_minutes']} min)\n"
+                    parts.append(f"    {i}. {session['topic']}{weak_flag} ({session['duration_minutes']} min)\n")
                         
                 if len(day['sessions']) > 3:
-                    summary += f"    ... and {len(day['sessions']) - 3} more sessions\n"
+                    parts.append(f"    ... and {len(day['sessions']) - 3} more sessions\n")
         
-        summary += "\n\nPERSONALIZED TIPS:\n"
+        parts.append("\n\nPERSONALIZED TIPS:\n")
         for tip in plan['study_tips']:
-            summary += f"  - {tip}\n"
+            parts.append(f"  - {tip}\n")
         
-        return summary
+        return "".join(parts)
+    
+    def to_json(self, plan: Dict) -> bytes:
+        """Serialize a plan to JSON bytes (for storing or sending)"""
+        
+        return orjson.dumps(
+            plan,
+            option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC
+        )
 
 
 # Example usage and testing
@@ -1,20 +1,21 @@
 import sys
 
-try:
-    import torch
-    from langchain_huggingface import HuggingFacePipeline
-    from transformers import pipeline
-    
-    print("🚀 Initializing model (GPT-2)...")
-    # GPT-2 small model hai, jaldi load hoga
-    pipe = pipeline("text-generation", model="gpt2", max_new_tokens=20)
-    hf_pipe = HuggingFacePipeline(pipeline=pipe)
-    
-    response = hf_pipe.invoke("The future of AI is")
-    print(f"\n✅ SUCCESS! Output: {response}")
+if __name__ == "__main__":
+    try:
+        from dotenv import load_dotenv
+        from langchain_huggingface import HuggingFaceEndpoint
 
-except ImportError as e:
-    print(f"❌ Missing Library: {e}")
-    print("Try running: pip install torch")
-except Exception as e:
-    print(f"❌ Error: {e}")
\ No newline at end of file
+        load_dotenv()
+
+        print("🚀 Connecting to model endpoint (GPT-2)...")
+        # Model HF endpoint pe chalta hai, local download/load nahi hota
+        llm = HuggingFaceEndpoint(repo_id="gpt2", max_new_tokens=20)
+
+        response = llm.invoke("The future of AI is")
+        print(f"\n✅ SUCCESS! Output: {response}")
+
+    except ImportError as e:
+        print(f"❌ Missing Library: {e}")
+        print("Try running: pip install langchain-huggingface")
+    except Exception as e:
+        print(f"❌ Error: {e}")